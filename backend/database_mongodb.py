@@ -4,18 +4,25 @@ Compatible with Vercel serverless deployment
 """
 
 import os
+import re
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
+from pymongo import MongoClient, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError
 import asyncio
+import threading
 
 logger = logging.getLogger(__name__)
 
 class MongoDBManager:
     """MongoDB database manager for parsed statements"""
     
+    # Seconds a get_statistics result is reused
+    STATISTICS_TTL = 30
+    
     def __init__(self):
         # Get MongoDB connection string from environment or config
         self.connection_string = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
@@ -23,30 +30,50 @@ class MongoDBManager:
         self.collection_name = 'statements'
         
         # Configuration is now handled entirely through environment variables
+        self.max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+        self.min_pool_size = int(os.getenv('MONGODB_MIN_POOL_SIZE', '5'))
+        self.server_selection_timeout_ms = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '2000'))
+        # WiredTiger block compressor for a newly created statements collection
+        self.block_compressor = os.getenv('MONGODB_BLOCK_COMPRESSOR', 'zstd')
         
         # Initialize MongoDB client
         self.client = None
         self.db = None
         self.collection = None
+        self._connect_lock = asyncio.Lock()
+        
+        # (expires_at, stats) from the last get_statistics, dropped on writes
+        self._statistics_cache = None
         
     async def connect(self):
-        """Connect to MongoDB"""
+        """Connect to MongoDB
+        One client (and connection pool) is shared for the manager's lifetime;
+        reconnecting only re-runs the ping and index setup."""
         try:
-            if self.connection_string.startswith('mongodb+srv://'):
-                # MongoDB Atlas connection
-                self.client = AsyncIOMotorClient(self.connection_string)
-            else:
-                # Local MongoDB connection
-                self.client = AsyncIOMotorClient(self.connection_string)
+            if self.client is None:
+                # Works for both local and Atlas (mongodb+srv://) connection strings
+                self.client = AsyncIOMotorClient(
+                    self.connection_string,
+                    maxPoolSize=self.max_pool_size,
+                    minPoolSize=self.min_pool_size,
+                    serverSelectionTimeoutMS=self.server_selection_timeout_ms
+                )
+            
+            # Pre-warm the pool and fail fast if the server is unreachable
+            await self.client.admin.command('ping')
             
             self.db = self.client[self.database_name]
+            await self._create_collection()
             self.collection = self.db[self.collection_name]
             
-            # Create indexes for better performance
-            await self.collection.create_index("filename")
-            await self.collection.create_index("bank")
-            await self.collection.create_index("parsed_at")
-            await self.collection.create_index("file_hash", unique=True)
+            # Create indexes for better performance, in a single command
+            await self.collection.create_indexes([
+                IndexModel("filename"),
+                IndexModel("bank"),
+                IndexModel("parsed_at"),
+                IndexModel("file_hash", unique=True),
+                IndexModel("content_hash"),
+            ])
             
             logger.info("Connected to MongoDB successfully")
             return True
@@ -55,48 +82,146 @@ class MongoDBManager:
             logger.error(f"Error connecting to MongoDB: {e}")
             return False
     
+    async def _create_collection(self):
+        """Create the statements collection with block compression
+        Statement documents are small and repetitive, so zstd stores them far
+        smaller than the default snappy. Existing collections are left as is."""
+        if not self.block_compressor:
+            return
+        try:
+            await self.db.create_collection(
+                self.collection_name,
+                storageEngine={"wiredTiger": {"configString": f"block_compressor={self.block_compressor}"}}
+            )
+            logger.info(f"Created {self.collection_name} collection with {self.block_compressor} compression")
+        except CollectionInvalid:
+            pass  # Already exists
+        except Exception as e:
+            # e.g. a storage engine without this compressor; the collection is
+            # then created implicitly on first insert
+            logger.warning(f"Could not create compressed collection: {e}")
+    
+    async def _ensure_connected(self):
+        """Connect on first use
+        Concurrent first requests wait for one connect instead of each
+        pinging and creating indexes themselves."""
+        if self.collection is not None:
+            return
+        async with self._connect_lock:
+            if self.collection is None:
+                await self.connect()
+    
     async def disconnect(self):
         """Disconnect from MongoDB"""
         if self.client:
             self.client.close()
             logger.info("Disconnected from MongoDB")
     
-    async def save_statement(self, statement_data: Dict) -> Optional[str]:
-        """Save parsed statement to MongoDB"""
+    # Parsed fields stored at the top level of each document; they also
+    # identify a statement when the file content hash is unknown
+    STATEMENT_FIELDS = ('filename', 'bank', 'due_date', 'last_4_digits', 'credit_limit',
+                        'available_credit', 'statement_date')
+    
+    # Fields update_statement may change
+    UPDATABLE_FIELDS = frozenset(STATEMENT_FIELDS) - {'filename'}
+    
+    def _file_hash(self, statement_data: Dict, content_hash: Optional[str] = None) -> str:
+        """Generate file hash for duplicate detection
+        Uses the SHA-256 of the PDF when known, otherwise a digest of the
+        parsed fields, so saving the same statement twice gives the same hash."""
+        if content_hash:
+            return content_hash
+        import hashlib
+        file_content = '\x1f'.join(str(statement_data.get(field) or '') for field in self.STATEMENT_FIELDS)
+        # BLAKE2b is faster than MD5 in software; 16 bytes keeps the 32-char hex
+        return hashlib.blake2b(file_content.encode(), digest_size=16).hexdigest()
+    
+    def _to_api_document(self, doc: Dict) -> Dict:
+        """Replace the ObjectId with a string id
+        Timestamps stay datetimes; the API's orjson responses write them in
+        ISO format."""
+        doc['id'] = str(doc.pop('_id'))
+        return doc
+    
+    def _build_document(self, statement_data: Dict, file_hash: str,
+                        content_hash: Optional[str] = None,
+                        parser_version: Optional[int] = None) -> Dict:
+        """Prepare a parsed statement for insertion
+        raw_data only keeps what isn't already a top-level field."""
+        document = {field: statement_data.get(field, '') for field in self.STATEMENT_FIELDS}
+        document['parsed_at'] = document['updated_at'] = datetime.utcnow()
+        document['file_hash'] = file_hash
+        raw_data = {
+            key: value for key, value in statement_data.items()
+            if key not in self.STATEMENT_FIELDS
+        }
+        if raw_data:
+            document['raw_data'] = raw_data
+        if content_hash:
+            document['content_hash'] = content_hash
+        if parser_version is not None:
+            document['parser_version'] = parser_version
+        return document
+    
+    @staticmethod
+    def _upsert_update(document: Dict) -> Dict:
+        """Update for an upsert keyed on file_hash
+        A statement keyed by content is only parsed again when the stored
+        result is outdated or failed, so the new parse replaces it (keeping
+        its id). Otherwise the stored statement is left as it is."""
+        if 'content_hash' in document:
+            fields = {key: value for key, value in document.items() if key != '_id'}
+            update = {"$set": fields}
+            # raw_data and parser_version are only written when present, so
+            # drop any the stored result had for a full replacement
+            stale = {key: "" for key in ('raw_data', 'parser_version') if key not in document}
+            if stale:
+                update["$unset"] = stale
+            if '_id' in document:
+                update["$setOnInsert"] = {"_id": document['_id']}
+            return update
+        return {"$setOnInsert": document}
+    
+    async def save_statement(self, statement_data: Dict, content_hash: Optional[str] = None,
+                             parser_version: Optional[int] = None) -> Optional[str]:
+        """Save parsed statement to MongoDB
+        content_hash is the SHA-256 of the source PDF, used to reuse results
+        parsed by the same parser_version"""
         try:
-            if self.collection is None:
-                await self.connect()
-            
-            # Generate file hash for duplicate detection
-            import hashlib
-            file_content = statement_data.get('filename', '') + str(datetime.now())
-            file_hash = hashlib.md5(file_content.encode()).hexdigest()
-            
-            # Check if statement already exists
-            existing = await self.collection.find_one({"file_hash": file_hash})
-            if existing:
-                logger.info(f"Statement already exists: {statement_data.get('filename')}")
-                return str(existing['_id'])
-            
-            # Prepare document for insertion
-            document = {
-                'filename': statement_data.get('filename', ''),
-                'bank': statement_data.get('bank', ''),
-                'due_date': statement_data.get('due_date', ''),
-                'last_4_digits': statement_data.get('last_4_digits', ''),
-                'credit_limit': statement_data.get('credit_limit', ''),
-                'available_credit': statement_data.get('available_credit', ''),
-                'statement_date': statement_data.get('statement_date', ''),
-                'parsed_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow(),
-                'file_hash': file_hash,
-                'raw_data': statement_data
-            }
+            await self._ensure_connected()
             
-            # Insert document
-            result = await self.collection.insert_one(document)
-            statement_id = str(result.inserted_id)
+            file_hash = self._file_hash(statement_data, content_hash)
             
+            # Insert-or-return-existing in one round trip: the upsert hands back
+            # the stored _id either way (see _upsert_update for what it
+            # writes). Presetting _id tells the two cases apart.
+            from bson import ObjectId
+            document = self._build_document(statement_data, file_hash, content_hash, parser_version)
+            document['_id'] = ObjectId()
+            try:
+                stored = await self.collection.find_one_and_update(
+                    {"file_hash": file_hash},
+                    self._upsert_update(document),
+                    projection={"_id": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # A concurrent save of the same statement won the insert
+                stored = await self.collection.find_one({"file_hash": file_hash}, {"_id": 1})
+            
+            if stored is None:
+                return None
+            statement_id = str(stored['_id'])
+            if stored['_id'] != document['_id']:
+                if content_hash:
+                    self._statistics_cache = None
+                    logger.info(f"Statement re-parsed: {statement_data.get('filename')}")
+                else:
+                    logger.info(f"Statement already exists: {statement_data.get('filename')}")
+                return statement_id
+            
+            self._statistics_cache = None
             logger.info(f"Statement saved with ID: {statement_id}")
             return statement_id
             
@@ -104,54 +229,117 @@ class MongoDBManager:
             logger.error(f"Error saving statement: {e}")
             return None
     
-    async def get_all_statements(self) -> List[Dict]:
-        """Get all parsed statements"""
+    async def save_statements_bulk(self, statements: List[Dict],
+                                   content_hashes: Optional[List[Optional[str]]] = None,
+                                   parser_version: Optional[int] = None) -> List[Optional[str]]:
+        """Save several parsed statements in one round trip
+        Returns an ID per statement in input order, like save_statement: the
+        new one when inserted, the stored statement's when its hash already
+        existed (re-parses update it in place), None when the save failed"""
+        if not statements:
+            return []
+        
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
             
-            cursor = self.collection.find({}).sort("parsed_at", -1)
-            statements = []
+            content_hashes = content_hashes or [None] * len(statements)
+            documents = [
+                self._build_document(statement_data, self._file_hash(statement_data, content_hash),
+                                     content_hash, parser_version)
+                for statement_data, content_hash in zip(statements, content_hashes)
+            ]
             
-            async for doc in cursor:
-                # Convert ObjectId to string
-                doc['id'] = str(doc['_id'])
-                del doc['_id']  # Remove ObjectId from response
-                
-                # Convert datetime objects to ISO format strings
-                if 'parsed_at' in doc and isinstance(doc['parsed_at'], datetime):
-                    doc['parsed_at'] = doc['parsed_at'].isoformat()
-                if 'updated_at' in doc and isinstance(doc['updated_at'], datetime):
-                    doc['updated_at'] = doc['updated_at'].isoformat()
-                
-                statements.append(doc)
+            # One upsert per statement keyed on file_hash, written as in
+            # save_statement, so the existence check rides along with the
+            # write. Unordered so one bad document doesn't stop the rest.
+            operations = [
+                UpdateOne({"file_hash": document['file_hash']}, self._upsert_update(document), upsert=True)
+                for document in documents
+            ]
+            failed = set()
+            try:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                upserted_ids = result.upserted_ids
+            except BulkWriteError as e:
+                upserted_ids = {item['index']: item['_id'] for item in e.details.get('upserted', [])}
+                # Concurrent upserts of the same hash can still lose the race
+                # on the unique index; those are duplicates, not failures
+                failed = {
+                    error['index'] for error in e.details.get('writeErrors', [])
+                    if error.get('code') != 11000
+                }
+                if failed:
+                    logger.error(f"Error saving {len(failed)} of {len(documents)} statements: {e}")
+            
+            statement_ids = [
+                str(upserted_ids[i]) if i in upserted_ids else None
+                for i in range(len(documents))
+            ]
             
-            return statements
+            # Duplicates resolve to the stored statement, as in save_statement
+            duplicates = [i for i in range(len(documents)) if i not in upserted_ids and i not in failed]
+            if duplicates:
+                hashes = [documents[i]['file_hash'] for i in duplicates]
+                cursor = self.collection.find({"file_hash": {"$in": hashes}}, {"file_hash": 1})
+                existing = {doc['file_hash']: str(doc['_id']) for doc in await cursor.to_list(length=None)}
+                for i in duplicates:
+                    statement_ids[i] = existing.get(documents[i]['file_hash'])
+                logger.info(f"{len(duplicates)} statements already existed")
+            
+            self._statistics_cache = None
+            logger.info(f"Saved {len(documents) - len(failed) - len(duplicates)} statements in bulk")
+            return statement_ids
+            
+        except Exception as e:
+            logger.error(f"Error saving statements: {e}")
+            return [None] * len(statements)
+    
+    async def _find_statements(self, search_filter: Dict, limit: Optional[int] = None,
+                               skip: int = 0, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Newest-first page of statements matching the filter
+        fields limits the returned fields (id is always included)"""
+        projection = dict.fromkeys(fields, 1) if fields else None
+        cursor = self.collection.find(search_filter, projection).sort("parsed_at", -1)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            # Whole page in the first batch, no getMore round trip
+            cursor = cursor.limit(limit).batch_size(limit)
+        return [self._to_api_document(doc) for doc in await cursor.to_list(length=None)]
+    
+    async def get_all_statements(self, limit: Optional[int] = None, skip: int = 0,
+                                 fields: Optional[List[str]] = None) -> List[Dict]:
+        """Get all parsed statements, optionally one page and a subset of fields"""
+        try:
+            await self._ensure_connected()
+            
+            return await self._find_statements({}, limit, skip, fields)
             
         except Exception as e:
             logger.error(f"Error fetching statements: {e}")
             return []
     
+    async def count_statements(self) -> Optional[int]:
+        """Total number of stored statements, from collection metadata"""
+        try:
+            await self._ensure_connected()
+            
+            return await self.collection.estimated_document_count()
+            
+        except Exception as e:
+            logger.error(f"Error counting statements: {e}")
+            return None
+    
     async def get_statement_by_id(self, statement_id: str) -> Optional[Dict]:
         """Get statement by ID"""
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
             
             from bson import ObjectId
             doc = await self.collection.find_one({"_id": ObjectId(statement_id)})
             
             if doc:
-                doc['id'] = str(doc['_id'])
-                del doc['_id']
-                
-                # Convert datetime objects to ISO format strings
-                if 'parsed_at' in doc and isinstance(doc['parsed_at'], datetime):
-                    doc['parsed_at'] = doc['parsed_at'].isoformat()
-                if 'updated_at' in doc and isinstance(doc['updated_at'], datetime):
-                    doc['updated_at'] = doc['updated_at'].isoformat()
-                
-                return doc
+                return self._to_api_document(doc)
             
             return None
             
@@ -159,52 +347,78 @@ class MongoDBManager:
             logger.error(f"Error fetching statement {statement_id}: {e}")
             return None
     
-    async def update_statement(self, statement_id: str, updates: Dict) -> bool:
-        """Update statement fields"""
+    async def find_statement_by_content_hash(self, content_hash: str,
+                                             parser_version: Optional[int] = None) -> Optional[Dict]:
+        """Get the most recent statement parsed from identical file content,
+        only by parser_version when given"""
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
+            
+            search_filter = {"content_hash": content_hash}
+            if parser_version is not None:
+                search_filter["parser_version"] = parser_version
+            doc = await self.collection.find_one(
+                search_filter,
+                sort=[("parsed_at", -1)]
+            )
+            
+            if doc:
+                return self._to_api_document(doc)
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error fetching statement by content hash: {e}")
+            return None
+    
+    async def update_statement(self, statement_id: str, updates: Dict) -> Optional[Dict]:
+        """Update statement fields
+        Returns the updated statement, or None if nothing was updated"""
+        try:
+            await self._ensure_connected()
             
             from bson import ObjectId
             
             # Prepare update document
-            update_doc = {}
-            for field, value in updates.items():
-                if field in ['bank', 'due_date', 'last_4_digits', 'credit_limit', 
-                            'available_credit', 'statement_date']:
-                    update_doc[field] = value
+            update_doc = {
+                field: value for field, value in updates.items()
+                if field in self.UPDATABLE_FIELDS
+            }
             
             if not update_doc:
-                return False
+                return None
             
             # Add updated_at timestamp
             update_doc['updated_at'] = datetime.utcnow()
             
-            result = await self.collection.update_one(
+            # Update and read back in one round trip
+            doc = await self.collection.find_one_and_update(
                 {"_id": ObjectId(statement_id)},
-                {"$set": update_doc}
+                {"$set": update_doc},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
+            if doc:
+                self._statistics_cache = None
                 logger.info(f"Statement {statement_id} updated successfully")
-                return True
+                return self._to_api_document(doc)
             
-            return False
+            return None
             
         except Exception as e:
             logger.error(f"Error updating statement {statement_id}: {e}")
-            return False
+            return None
     
     async def delete_statement(self, statement_id: str) -> bool:
         """Delete statement by ID"""
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
             
             from bson import ObjectId
             result = await self.collection.delete_one({"_id": ObjectId(statement_id)})
             
             if result.deleted_count > 0:
+                self._statistics_cache = None
                 logger.info(f"Statement {statement_id} deleted successfully")
                 return True
             
@@ -214,36 +428,22 @@ class MongoDBManager:
             logger.error(f"Error deleting statement {statement_id}: {e}")
             return False
     
-    async def search_statements(self, query: str) -> List[Dict]:
+    async def search_statements(self, query: str, limit: Optional[int] = None, skip: int = 0,
+                                fields: Optional[List[str]] = None) -> List[Dict]:
         """Search statements by filename or bank"""
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
             
-            # Create search filter
+            # Create search filter, matching the query as a literal substring
+            pattern = re.escape(query)
             search_filter = {
                 "$or": [
-                    {"filename": {"$regex": query, "$options": "i"}},
-                    {"bank": {"$regex": query, "$options": "i"}}
+                    {"filename": {"$regex": pattern, "$options": "i"}},
+                    {"bank": {"$regex": pattern, "$options": "i"}}
                 ]
             }
             
-            cursor = self.collection.find(search_filter).sort("parsed_at", -1)
-            statements = []
-            
-            async for doc in cursor:
-                doc['id'] = str(doc['_id'])
-                del doc['_id']
-                
-                # Convert datetime objects to ISO format strings
-                if 'parsed_at' in doc and isinstance(doc['parsed_at'], datetime):
-                    doc['parsed_at'] = doc['parsed_at'].isoformat()
-                if 'updated_at' in doc and isinstance(doc['updated_at'], datetime):
-                    doc['updated_at'] = doc['updated_at'].isoformat()
-                
-                statements.append(doc)
-            
-            return statements
+            return await self._find_statements(search_filter, limit, skip, fields)
             
         except Exception as e:
             logger.error(f"Error searching statements: {e}")
@@ -252,33 +452,37 @@ class MongoDBManager:
     async def get_statistics(self) -> Dict:
         """Get database statistics"""
         try:
-            if self.collection is None:
-                await self.connect()
+            await self._ensure_connected()
             
-            # Total statements
-            total_statements = await self.collection.count_documents({})
+            cached = self._statistics_cache
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
             
-            # Statements by bank
+            # Statements by bank, with recent activity (last 7 days) counted
+            # in the same pass; totals are summed from the groups
+            from datetime import timedelta
+            week_ago = datetime.utcnow() - timedelta(days=7)
             pipeline = [
-                {"$group": {"_id": "$bank", "count": {"$sum": 1}}},
+                {"$group": {
+                    "_id": "$bank",
+                    "count": {"$sum": 1},
+                    "recent": {"$sum": {"$cond": [{"$gte": ["$parsed_at", week_ago]}, 1, 0]}}
+                }},
                 {"$sort": {"count": -1}}
             ]
             bank_stats = {}
-            async for doc in self.collection.aggregate(pipeline):
+            recent_week = 0
+            for doc in await self.collection.aggregate(pipeline).to_list(length=None):
                 bank_stats[doc['_id']] = doc['count']
+                recent_week += doc['recent']
             
-            # Recent activity (last 7 days)
-            from datetime import timedelta
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_week = await self.collection.count_documents({
-                "parsed_at": {"$gte": week_ago}
-            })
-            
-            return {
-                'total_statements': total_statements,
+            stats = {
+                'total_statements': sum(bank_stats.values()),
                 'bank_distribution': bank_stats,
                 'recent_week': recent_week
             }
+            self._statistics_cache = (time.monotonic() + self.STATISTICS_TTL, stats)
+            return stats
             
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
@@ -299,66 +503,51 @@ class SyncMongoDBManager:
     
     def __init__(self):
         self.async_manager = MongoDBManager()
+        # Motor binds its connections to one event loop, so every call runs
+        # on the same background loop instead of a fresh loop per call
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mongodb-sync", daemon=True)
+        self._thread.start()
+        self._run(self.async_manager.connect())
+    
+    def _run(self, coro):
+        """Run a coroutine on the background loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
     
     def save_statement(self, statement_data: Dict) -> Optional[str]:
         """Sync wrapper for save_statement"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.save_statement(statement_data))
-        finally:
-            loop.close()
+        return self._run(self.async_manager.save_statement(statement_data))
+    
+    def save_statements_bulk(self, statements: List[Dict]) -> List[Optional[str]]:
+        """Sync wrapper for save_statements_bulk"""
+        return self._run(self.async_manager.save_statements_bulk(statements))
     
     def get_all_statements(self) -> List[Dict]:
         """Sync wrapper for get_all_statements"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.get_all_statements())
-        finally:
-            loop.close()
+        return self._run(self.async_manager.get_all_statements())
     
     def get_statement_by_id(self, statement_id: str) -> Optional[Dict]:
         """Sync wrapper for get_statement_by_id"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.get_statement_by_id(statement_id))
-        finally:
-            loop.close()
+        return self._run(self.async_manager.get_statement_by_id(statement_id))
     
-    def update_statement(self, statement_id: str, updates: Dict) -> bool:
+    def update_statement(self, statement_id: str, updates: Dict) -> Optional[Dict]:
         """Sync wrapper for update_statement"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.update_statement(statement_id, updates))
-        finally:
-            loop.close()
+        return self._run(self.async_manager.update_statement(statement_id, updates))
     
     def delete_statement(self, statement_id: str) -> bool:
         """Sync wrapper for delete_statement"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.delete_statement(statement_id))
-        finally:
-            loop.close()
+        return self._run(self.async_manager.delete_statement(statement_id))
     
     def search_statements(self, query: str) -> List[Dict]:
         """Sync wrapper for search_statements"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.search_statements(query))
-        finally:
-            loop.close()
+        return self._run(self.async_manager.search_statements(query))
     
     def get_statistics(self) -> Dict:
         """Sync wrapper for get_statistics"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.async_manager.get_statistics())
-        finally:
-            loop.close()
+        return self._run(self.async_manager.get_statistics())
+    
+    def close(self):
+        """Disconnect and stop the background loop"""
+        self._run(self.async_manager.disconnect())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -4,16 +4,17 @@ FastAPI Backend for Credit Card Statement Parser
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 import os
-import shutil
+import asyncio
+import hashlib
 import tempfile
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 from dotenv import load_dotenv
 from parser import CreditCardParser
-from database_mongodb import MongoDBManager
+from database_mongodb import db_manager
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -27,7 +28,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Credit Card Statement Parser",
     description="Upload and parse credit card statements to extract key information",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Ensure DB connection on startup
@@ -38,6 +40,13 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB on startup: {e}")
 
+# Let in-flight background saves finish, then close the connection pool
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _background_saves:
+        await asyncio.gather(*_background_saves, return_exceptions=True)
+    await db_manager.disconnect()
+
 # Add CORS middleware - Allow all origins
 app.add_middleware(
     CORSMiddleware,
@@ -47,14 +56,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize parser and database
-parser = CreditCardParser()
-db_manager = MongoDBManager()
+# Initialize parser; the database manager is the shared module-level instance.
+# Both hold pools (OCR threads, MongoDB connections) - never create them per request.
+parser = CreditCardParser(
+    text_backend=os.getenv('PDF_TEXT_BACKEND', 'pypdf2'),
+    text_cache_dir=os.getenv('PDF_TEXT_CACHE_DIR')
+)
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Pending fire-and-forget database saves
+_background_saves = set()
+
+# Caps how many statements are parsed at once, across all requests
+PARSE_CONCURRENCY = os.cpu_count() or 1
+_parse_semaphore = asyncio.Semaphore(PARSE_CONCURRENCY)
+
+# Copy uploads to disk in 1MB chunks to cut read/write syscalls
+COPY_BUFFER_SIZE = 1 << 20
+
+# Uploads smaller than this are parsed straight from memory, skipping the
+# temp file write/read/unlink round-trip
+IN_MEMORY_UPLOAD_LIMIT = 10_000_000
+
 # Pydantic models for request/response
 class StatementUpdate(BaseModel):
     bank: Optional[str] = None
@@ -64,6 +90,106 @@ class StatementUpdate(BaseModel):
     available_credit: Optional[str] = None
     statement_date: Optional[str] = None
 
+async def _parse_upload(file: UploadFile) -> Tuple[Dict, str]:
+    """Parse an uploaded PDF - in memory when small, via a temp file otherwise.
+    Returns the result and the SHA-256 of the file content. If identical
+    content was parsed before, the stored result (with its id) is reused."""
+    if file.size is not None and file.size < IN_MEMORY_UPLOAD_LIMIT:
+        data = await file.read()
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = await _find_cached_result(content_hash)
+        if cached:
+            return cached, content_hash
+        async with _parse_semaphore:
+            return await parser.parse_statement(data, content_hash), content_hash
+    
+    temp_path = None
+    try:
+        # Stream the upload to a temp file chunk by chunk, hashing it on the
+        # way - peak memory stays at one chunk. UploadFile.read runs the
+        # blocking read of its spooled file off the event loop.
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+            while chunk := await file.read(COPY_BUFFER_SIZE):
+                digest.update(chunk)
+                temp_file.write(chunk)
+            temp_path = temp_file.name
+        
+        content_hash = digest.hexdigest()
+        cached = await _find_cached_result(content_hash)
+        if cached:
+            return cached, content_hash
+        async with _parse_semaphore:
+            return await parser.parse_statement(temp_path, content_hash), content_hash
+    
+    finally:
+        # Clean up temporary file
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+def _reusable_hash(result: Dict, content_hash: Optional[str]) -> Optional[str]:
+    """The content hash to store a result under, or None for a failed parse -
+    those are still saved, but never handed back for the same content"""
+    return None if parser.is_incomplete(result) else content_hash
+
+def _save_in_background(result: Dict, content_hash: str):
+    """Save a parsed statement without holding up the response"""
+    # Snapshot the result - the caller keeps adding response-only keys to it
+    task = asyncio.create_task(db_manager.save_statement(
+        dict(result), content_hash=_reusable_hash(result, content_hash),
+        parser_version=parser.PARSER_VERSION
+    ))
+    _background_saves.add(task)  # Keep a reference until the task is done
+    task.add_done_callback(_on_background_save_done)
+
+def _on_background_save_done(task: asyncio.Task):
+    _background_saves.discard(task)
+    if task.cancelled():
+        logger.warning("Background save cancelled")
+    elif task.exception():
+        logger.warning(f"Failed to save to database: {task.exception()}")
+    elif task.result():
+        logger.info(f"Statement saved to database with ID: {task.result()}")
+    else:
+        logger.warning("Failed to save to database")
+
+async def _find_cached_result(content_hash: str) -> Optional[Dict]:
+    """Look up a previous parse of identical file content by this parser version.
+    Failed parses are never reused, so fixing OCR set-up takes effect."""
+    statement = await db_manager.find_statement_by_content_hash(content_hash, parser.PARSER_VERSION)
+    if not statement or parser.is_incomplete(statement):
+        return None
+    
+    logger.info(f"Reusing parsed statement {statement['id']} for identical content")
+    result = {key: statement.get(key) for key in parser.FIELDS}
+    result['bank'] = statement.get('bank')
+    result['id'] = statement['id']
+    return result
+
+async def _parse_batch_file(file: UploadFile) -> Tuple[Dict, Optional[str]]:
+    """Parse one file of a /parse-multiple batch, reporting failure in the result"""
+    try:
+        # Parse the statement
+        logger.info(f"Parsing file: {file.filename}")
+        result, content_hash = await _parse_upload(file)
+        result['filename'] = file.filename
+        result['success'] = True
+        return result, content_hash
+        
+    except Exception as e:
+        logger.error(f"Error parsing {file.filename}: {e}")
+        return {
+            'filename': file.filename,
+            'success': False,
+            'error': str(e),
+            'bank': 'UNKNOWN',
+            'due_date': None,
+            'last_4_digits': None,
+            'credit_limit': None,
+            'available_credit': None,
+            'statement_date': None
+        }, None
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -82,31 +208,21 @@ async def parse_single_statement(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Create temporary file
-    temp_path = None
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-        
         # Parse the statement
         logger.info(f"Parsing file: {file.filename}")
-        result = parser.parse_statement(temp_path)
+        result, content_hash = await _parse_upload(file)
         
         # Add filename to result
         result['filename'] = file.filename
         
-        # Save to database
-        try:
-            statement_id = await db_manager.save_statement(result)
-            result['id'] = statement_id
-            logger.info(f"Statement saved to database with ID: {statement_id}")
-        except Exception as e:
-            logger.warning(f"Failed to save to database: {e}")
+        # Save to database in the background, unless this is a stored result
+        # being reused. The id isn't known yet - it shows up in /statements.
+        if 'id' not in result:
+            _save_in_background(result, content_hash)
             result['id'] = None
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "data": result,
             "message": "Statement parsed successfully"
@@ -115,11 +231,6 @@ async def parse_single_statement(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error parsing statement: {e}")
         raise HTTPException(status_code=500, detail=f"Error parsing statement: {str(e)}")
-    
-    finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
 
 @app.post("/parse-multiple")
 async def parse_multiple_statements(files: List[UploadFile] = File(...)):
@@ -129,63 +240,41 @@ async def parse_multiple_statements(files: List[UploadFile] = File(...)):
     if len(files) > 10:  # Limit to 10 files
         raise HTTPException(status_code=400, detail="Maximum 10 files allowed")
     
-    results = []
-    temp_paths = []
+    # Parse all PDFs concurrently - skip non-PDF files
+    parsed = await asyncio.gather(*(
+        _parse_batch_file(file) for file in files
+        if file.filename.lower().endswith('.pdf')
+    ))
+    results = [result for result, _ in parsed]
     
-    try:
-        for file in files:
-            if not file.filename.lower().endswith('.pdf'):
-                continue  # Skip non-PDF files
-            
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                shutil.copyfileobj(file.file, temp_file)
-                temp_path = temp_file.name
-                temp_paths.append(temp_path)
-            
-            try:
-                # Parse the statement
-                logger.info(f"Parsing file: {file.filename}")
-                result = parser.parse_statement(temp_path)
-                result['filename'] = file.filename
-                result['success'] = True
-                
-                # Save to database
-                try:
-                    statement_id = await db_manager.save_statement(result)
-                    result['id'] = statement_id
-                    logger.info(f"Statement saved to database with ID: {statement_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to save to database: {e}")
-                    result['id'] = None
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error parsing {file.filename}: {e}")
-                results.append({
-                    'filename': file.filename,
-                    'success': False,
-                    'error': str(e),
-                    'bank': 'UNKNOWN',
-                    'due_date': None,
-                    'last_4_digits': None,
-                    'credit_limit': None,
-                    'available_credit': None,
-                    'statement_date': None
-                })
-        
-        return JSONResponse(content={
-            "success": True,
-            "data": results,
-            "message": f"Processed {len(results)} files"
-        })
+    # Queue for the database, unless this is a stored result being reused
+    pending_saves = [
+        (result, content_hash) for result, content_hash in parsed
+        if result['success'] and 'id' not in result
+    ]
+    
+    # Save to database in one round trip
+    if pending_saves:
+        statements = [result for result, _ in pending_saves]
+        content_hashes = [
+            _reusable_hash(result, content_hash) for result, content_hash in pending_saves
+        ]
+        try:
+            statement_ids = await db_manager.save_statements_bulk(
+                statements, content_hashes, parser_version=parser.PARSER_VERSION
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save to database: {e}")
+            statement_ids = [None] * len(statements)
         
-    finally:
-        # Clean up temporary files
-        for temp_path in temp_paths:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        for result, statement_id in zip(statements, statement_ids):
+            result['id'] = statement_id
+    
+    return ORJSONResponse(content={
+        "success": True,
+        "data": results,
+        "message": f"Processed {len(results)} files"
+    })
 
 @app.get("/supported-banks")
 async def get_supported_banks():
@@ -208,20 +297,70 @@ async def get_supported_banks():
     }
 
 # Database endpoints
+def _split_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated fields query parameter"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()] or None
+
+def _to_columns(statements: List[Dict]) -> Dict[str, List]:
+    """Turn a list of statements into one list of values per field
+    Each key is sent once instead of once per statement."""
+    columns = {}
+    for statement in statements:
+        for key in statement:
+            columns.setdefault(key, None)
+    return {
+        key: [statement.get(key) for statement in statements]
+        for key in columns
+    }
+
 @app.get("/statements")
-async def get_all_statements():
-    """Get all previously parsed statements"""
+async def get_all_statements(
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of statements to return"),
+    offset: int = Query(0, ge=0, description="Number of statements to skip"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    columnar: bool = Query(False, description="Return data as {field: [values]} instead of a list")
+):
+    """Get all previously parsed statements, newest first
+    A paged request also reports the total, fetched alongside the page."""
     try:
-        statements = await db_manager.get_all_statements()
-        return JSONResponse(content={
+        page = db_manager.get_all_statements(limit, offset, _split_fields(fields))
+        if limit or offset:
+            statements, total = await asyncio.gather(page, db_manager.count_statements())
+        else:
+            statements = await page
+            total = len(statements)
+        return ORJSONResponse(content={
             "success": True,
-            "data": statements,
-            "count": len(statements)
+            "data": _to_columns(statements) if columnar else statements,
+            "count": len(statements),
+            "total": total
         })
     except Exception as e:
         logger.error(f"Error fetching statements: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching statements: {str(e)}")
 
+@app.get("/statements/search")
+async def search_statements(
+    q: str = Query(..., description="Search query"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of statements to return"),
+    offset: int = Query(0, ge=0, description="Number of statements to skip"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Search statements by filename or bank"""
+    try:
+        statements = await db_manager.search_statements(q, limit, offset, _split_fields(fields))
+        return ORJSONResponse(content={
+            "success": True,
+            "data": statements,
+            "count": len(statements),
+            "query": q
+        })
+    except Exception as e:
+        logger.error(f"Error searching statements: {e}")
+        raise HTTPException(status_code=500, detail=f"Error searching statements: {str(e)}")
+
 @app.get("/statements/{statement_id}")
 async def get_statement(statement_id: str):
     """Get specific statement by ID"""
@@ -230,7 +369,7 @@ async def get_statement(statement_id: str):
         if not statement:
             raise HTTPException(status_code=404, detail="Statement not found")
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "data": statement
         })
@@ -245,18 +384,17 @@ async def update_statement(statement_id: str, updates: StatementUpdate):
     """Update statement fields"""
     try:
         # Convert Pydantic model to dict, excluding None values
-        update_dict = {k: v for k, v in updates.dict().items() if v is not None}
+        update_dict = updates.model_dump(exclude_none=True)
         
         if not update_dict:
             raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        success = await db_manager.update_statement(statement_id, update_dict)
-        if not success:
+        # Returns the updated statement
+        updated_statement = await db_manager.update_statement(statement_id, update_dict)
+        if not updated_statement:
             raise HTTPException(status_code=404, detail="Statement not found or no changes made")
         
-        # Return updated statement
-        updated_statement = await db_manager.get_statement_by_id(statement_id)
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "data": updated_statement,
             "message": "Statement updated successfully"
@@ -275,7 +413,7 @@ async def delete_statement(statement_id: str):
         if not success:
             raise HTTPException(status_code=404, detail="Statement not found")
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "message": "Statement deleted successfully"
         })
@@ -285,27 +423,12 @@ async def delete_statement(statement_id: str):
         logger.error(f"Error deleting statement {statement_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Error deleting statement: {str(e)}")
 
-@app.get("/statements/search")
-async def search_statements(q: str = Query(..., description="Search query")):
-    """Search statements by filename or bank"""
-    try:
-        statements = await db_manager.search_statements(q)
-        return JSONResponse(content={
-            "success": True,
-            "data": statements,
-            "count": len(statements),
-            "query": q
-        })
-    except Exception as e:
-        logger.error(f"Error searching statements: {e}")
-        raise HTTPException(status_code=500, detail=f"Error searching statements: {str(e)}")
-
 @app.get("/statistics")
 async def get_statistics():
     """Get database statistics"""
     try:
         stats = await db_manager.get_statistics()
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "data": stats
         })
@@ -7,43 +7,450 @@ Extracts: Due Date, Last 4 Digits, Credit Limit, Available Credit, Statement Dat
 Based on actual text extraction analysis from debug output
 """
 
+import io
+import os
 import re
+import mmap
+import asyncio
+import hashlib
+import tempfile
+import threading
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, convert_from_bytes
 from PyPDF2 import PdfReader
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Pattern, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+try:
+    # Linear-time matching - no catastrophic backtracking on noisy OCR text
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    # In-process libtesseract - no subprocess or temp image per page
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# RE2's \s only covers ASCII whitespace, Python's also covers the no-break and
+# other Unicode spaces PDFs are full of. Fold those to a plain space before
+# matching with RE2 so \s agrees between the engines (\d and \w still don't,
+# see _compile_pattern).
+_RE2_WHITESPACE = {c: ' ' for c in range(0x3001) if chr(c).isspace() and chr(c) not in ' \t\n\r\f'}
+
+
+class _AmountTable(dict):
+    """str.translate table keeping digits, commas and decimal points.
+    Same set as the old [^\\d,.] stdlib regex (any Unicode decimal digit
+    counts), though that only matters on the re fallback - under RE2 the
+    amount patterns never capture non-ASCII digits. Each character's verdict
+    is computed once and memoized."""
+
+    def __missing__(self, c: int):
+        ch = chr(c)
+        keep = ch.isdecimal() or ch in ',.'
+        self[c] = c if keep else None
+        return self[c]
+
+
+_AMOUNT_TABLE = _AmountTable()
+
+# Shared pool for per-page OCR. pytesseract runs the tesseract binary in a
+# subprocess, so threads give real parallelism without pickling page images
+# across process boundaries. Created once to avoid pool setup per request.
+OCR_MAX_WORKERS = os.cpu_count() or 1
+_ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr")
+
+
+_tesserocr_local = threading.local()
+
+# PDFium is not thread-safe: no two calls may overlap, even on different
+# documents, so all pypdfium2 use is serialized on this lock
+_pdfium_lock = threading.Lock()
+
+
+def _tesserocr_api():
+    """This thread's tesserocr API. Each one keeps the language model loaded
+    between pages, and an API instance must not be shared across threads."""
+    api = getattr(_tesserocr_local, "api", None)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang='eng', psm=tesserocr.PSM.SINGLE_BLOCK)
+        _tesserocr_local.api = api
+    return api
+
+
+def _ocr_one_page(image) -> str:
+    """OCR a single rendered page"""
+    if tesserocr is not None:
+        api = _tesserocr_api()
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(image, lang='eng', config='--psm 6')
+
+
+def _ocr_and_release(image) -> str:
+    """OCR a single rendered page, then free its pixel buffer so a page is
+    only held in memory while it is being read"""
+    try:
+        return _ocr_one_page(image)
+    finally:
+        image.close()
+
+
+def _ocr_pages_batched(images: List) -> List[str]:
+    """OCR all pages with a single tesseract invocation via a multi-page TIFF.
+    Pays tesseract's process start-up and model load once instead of per page."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tiff_path = os.path.join(tmp_dir, "pages.tiff")
+        images[0].save(tiff_path, format='TIFF', save_all=True, append_images=images[1:])
+        text = pytesseract.image_to_string(tiff_path, lang='eng', config='--psm 6')
+    # tesseract separates pages with a form feed
+    pages = text.split('\f')
+    return pages[:len(images)] + [''] * (len(images) - len(pages))
+
+
+def _compile_pattern(pattern: str) -> Pattern:
+    """Compile with RE2 when available, falling back to stdlib re for
+    anything RE2 rejects.
+    Under RE2, \\d and \\w are ASCII-only, where re also matches Unicode
+    digits and letters ('٣٤5' gives '5', 'café' stops at 'caf'). google-re2 is
+    a requirement, so statements are matched with the ASCII meaning; the bank
+    patterns only need ASCII digits and labels."""
+    if re2 is not None:
+        try:
+            return re2.compile('(?is)' + pattern)
+        except re2.error:
+            logger.warning(f"RE2 rejected pattern, using re: {pattern}")
+    return re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+
+def _compile_patterns(*patterns: str) -> List[Pattern]:
+    """Compile field patterns with the flags every bank parser uses"""
+    return [_compile_pattern(pattern) for pattern in patterns]
+
 
 class CreditCardParser:
     """Enhanced parser based on actual PDF text patterns"""
     
-    def __init__(self, tesseract_path: Optional[str] = None):
+    FIELDS = ['due_date', 'last_4_digits', 'credit_limit', 'available_credit', 'statement_date']
+    
+    # Bump when extraction or the bank patterns change, so results stored by
+    # an older version are parsed again instead of reused
+    PARSER_VERSION = 1
+    
+    # Lowercase bank keywords, checked in order - first bank with a hit wins
+    BANK_KEYWORDS = {
+        "HDFC": ("hdfc bank", "hdfcbank"),
+        "ICICI": ("icici bank", "icicibank"),
+        "KOTAK": ("kotak",),
+        "AMEX": ("american express", "amex", "aebc"),
+        "CAPITAL_ONE": ("capital one", "capitalone"),
+    }
+    
+    # Fields where OCR output is more accurate than PyPDF2 for a given bank
+    OCR_PREFERRED_FIELDS = {
+        # OCR is more accurate for HDFC available credit
+        "HDFC": {"available_credit"},
+        # OCR has the credit values for ICICI
+        "ICICI": {"credit_limit", "available_credit", "statement_date"},
+    }
+    
+    # strptime formats, grouped by the shape of the date string they can match
+    _DATE_FORMATS_SLASH = ('%d/%m/%Y', '%d/%m/%y')
+    _DATE_FORMATS_DASH = ('%d-%m-%Y', '%d-%m-%y')
+    _DATE_FORMATS_COMMA = ('%B %d, %Y', '%b %d, %Y')
+    _DATE_FORMATS_NAMED = (
+        '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d-%B-%Y',
+        '%d %b %y', '%d %B %y', '%d %b-%Y', '%d-%b %Y',
+    )
+    
+    # OCR the first page, then the next two only if fields are still missing
+    OCR_PAGE_RANGES = [(1, 1), (2, 3)]
+    OCR_DPI = 200
+    # Pages that come back this short at OCR_DPI (small print, faint scans)
+    # are rendered and read again at OCR_RETRY_DPI
+    OCR_MIN_PAGE_CHARS = 200
+    OCR_RETRY_DPI = 300
+    
+    # Parsed results kept per content digest, so re-parsing the same PDF
+    # (retries, repeated uploads) skips extraction and OCR entirely.
+    RESULT_CACHE_SIZE = 256
+    
+    DATE_FIELDS = {'due_date', 'statement_date'}
+    AMOUNT_FIELDS = {'credit_limit', 'available_credit'}
+    
+    # Bank-specific patterns, compiled once at import. Each field maps to a
+    # list of alternatives tried in order.
+    _PATTERNS = {
+        "HDFC": {
+            # Due Date - Pattern: Payment Due Date Total Dues Minimum Amount Due
+            #                     28/06/2019 45,240.00 13,636.00
+            'due_date': _compile_patterns(
+                r'Payment\s+Due\s+Date\s+Total\s+Dues\s+Minimum\s+Amount\s+Due\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+                r'Payment\s+Due\s+Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+            ),
+            # Card Number: Card No: 5228 52XX XXXX 0591
+            'last_4_digits': _compile_patterns(
+                r'Card\s+No[:\s]+\d{4}\s+\d{2}XX\s+XXXX\s+(\d{4})',
+            ),
+            # Credit Limit - First number after "Credit Limit Available Credit Limit",
+            # Available Credit (PyPDF2) the optional second - shows 23,519 which might be wrong
+            'credit_limit_available_credit': _compile_patterns(
+                r'Credit\s+Limit\s+Available\s+Credit\s+Limit[^\d]+(\d{1},?\d{2},\d{3})(?:\s+([0-9,]+))?',
+            ),
+            'available_credit': _compile_patterns(
+                r'Credit\s+Limit\s+Available\s+Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}\s+([0-9,]+)',
+            ),
+            # Available Credit (OCR) - look for pattern with comma: 2,56,760.00
+            'available_credit_ocr': _compile_patterns(
+                r'Available\s+Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}[^\d]+(\d{1},\d{2},\d{3}(?:\.\d{2})?)',
+                r'Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}[^\d]+(\d{1},\d{2},\d{3}(?:\.\d{2})?)',
+            ),
+            'statement_date': _compile_patterns(
+                r'Statement\s+Date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+            ),
+        },
+        "ICICI": {
+            'due_date': _compile_patterns(
+                r'Due\s+Date\s*:\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+            ),
+            'last_4_digits': _compile_patterns(
+                r'\d{4}\s+XXXX\s+XXXX\s+(\d{3,4})',
+            ),
+            # MUST match the line AFTER "Credit Limit Available Credit"
+            # Pattern: Credit Limit Available Credit ... Summary 83,000.00 77,115.48
+            'credit_limit_available_credit': _compile_patterns(
+                # Match: Credit [Credit] Limit Available Credit ... Summary XX,XXX.XX XX,XXX.XX
+                r'Credit\s+(?:Credit\s+)?Limit\s+Available\s+Credit[^S]*?Summary\s+(\d{1,3},\d{3}(?:\.\d{2})?)\s+(\d{1,3},\d{3}(?:\.\d{2})?)',
+                # PyPDF2 format: Credit SummaryCredit Limit Available Credit\n83,000.00 77,115.48
+                r'Credit\s+Summary\s*Credit\s+Limit\s+Available\s+Credit[^\d]+(\d{1,3},\d{3}(?:\.\d{2})?)\s+(\d{1,3},\d{3}(?:\.\d{2})?)',
+            ),
+            'statement_date': _compile_patterns(
+                r'Statement\s+Date[^\d]{0,50}?(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+            ),
+        },
+        "KOTAK": {
+            'due_date': _compile_patterns(
+                r'Due\s+Date\s+(\d{1,2}[-/]\w{3}[-/]\d{4})',
+            ),
+            # Card Number: 414767XXXXXX6705
+            'last_4_digits': _compile_patterns(
+                r'\d{6}X+(\d{4})',
+            ),
+            # Credit Limit - First number: 900,000
+            # Available Credit - Second number: 380,229.49
+            'credit_limit_available_credit': _compile_patterns(
+                r'Credit\s+Limit\s*\(Rs\.\)\s+Available\s+Credit[^\d]+([0-9,]+(?:\.\d{2})?)(?:\s+([0-9,]+(?:\.\d{2})?))?',
+            ),
+            'available_credit': _compile_patterns(
+                r'Credit\s+Limit\s*\(Rs\.\)\s+Available\s+Credit[^\d]+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
+            ),
+            'statement_date': _compile_patterns(
+                r'Statement\s+Date\s+(\d{1,2}[-/]\w{3}[-/]\d{4})',
+            ),
+        },
+        "AMEX": {
+            # Due Date: February 1, 2024
+            'due_date': _compile_patterns(
+                r'Due\s+by\s+(\w+\s+\d{1,2},?\s+\d{4})',
+                r'Minimum\s+Payment:\s+Rs\s+[0-9,]+(?:\.\d{2})?\s+Due\s+by\s+(\w+\s+\d{1,2},?\s+\d{4})',
+            ),
+            # Membership Number: XXXX-XXXXXX-01007 (last 5 digits)
+            'last_4_digits': _compile_patterns(
+                r'XXXX-XXXX+-(\d{5})',
+                r'Membership\s+Number[^\d]+XXXX-XXXX+-(\d{5})',
+            ),
+            # Credit Limit: Pattern shows 470,000.00 257,545.52 on same line,
+            # Available Credit Limit is the second number
+            'credit_limit_available_credit': _compile_patterns(
+                r'Credit\s+Summary\s+Credit\s+Limit\s+Rs[^\d]+Available\s+Credit\s+Limit\s+Rs[^\d]+At[^\d]+\d{1,2}[/-]\d{1,2}[/-]\d{4}\s+([0-9,]+(?:\.\d{2})?)(?:\s+([0-9,]+(?:\.\d{2})?))?',
+                r'At\s+\w+\s+\d{1,2},?\s+\d{4}\s+([0-9,]+(?:\.\d{2})?)\s+([0-9,]+(?:\.\d{2})?)',
+            ),
+            'available_credit': _compile_patterns(
+                r'Credit\s+Summary\s+Credit\s+Limit\s+Rs[^\d]+Available\s+Credit\s+Limit\s+Rs[^\d]+At[^\d]+\d{1,2}[/-]\d{1,2}[/-]\d{4}\s+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
+                r'At\s+\w+\s+\d{1,2},?\s+\d{4}\s+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
+            ),
+            # Statement Date: From "Membership Number Date" field
+            'statement_date': _compile_patterns(
+                r'Membership\s+Number\s+Date[^\d]+XXXX-XXXX+-\d{5}\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+                r'Date[^\d]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
+            ),
+        },
+        "CAPITAL_ONE": {
+            # Due Date: It's due on 31 Oct 24
+            'due_date': _compile_patterns(
+                r"It'?s\s+due\s+on\s+(\d{1,2}\s+\w{3}\s+\d{2,4})",
+            ),
+            # Card Number: **** **** **** 4811
+            'last_4_digits': _compile_patterns(
+                r'\*{4}\s+\*{4}\s+\*{4}\s+(\d{4})',
+            ),
+            'credit_limit': _compile_patterns(
+                r'Credit\s+limit[^\d]+£([0-9,]+(?:\.\d{2})?)',
+            ),
+            # Available to spend - handle newlines between "as" and "at"
+            'available_credit': _compile_patterns(
+                r'Available\s+to\s+spend\s+as[^\d£]*at[^\d]+\d{2}/\d{2}/\d{2}[^\d£]+£([0-9,]+(?:\.\d{2})?)',
+                r'Available\s+to\s+spend[^\d£]+£([0-9,]+(?:\.\d{2})?)',
+            ),
+            # Statement Date: Statement date 5 October 24
+            'statement_date': _compile_patterns(
+                r'Statement\s+date[^\d]+(\d{1,2}\s+\w+\s+\d{2,4})',
+            ),
+        },
+    }
+    
+    # Text-layer extractors. The bank patterns were tuned on PyPDF2 output;
+    # pdfium and PyMuPDF (both C) are much faster but lay text out differently.
+    TEXT_BACKENDS = ("pypdf2", "pdfium", "pymupdf")
+    
+    def __init__(self, tesseract_path: Optional[str] = None, text_backend: str = "pypdf2",
+                 text_cache_dir: Optional[str] = None):
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        if text_backend not in self.TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend: {text_backend}")
+        self.text_backend = text_backend
+        # Extracted and OCR text is kept here across runs, keyed by content hash
+        self.text_cache_dir = text_cache_dir
+        if text_cache_dir:
+            os.makedirs(text_cache_dir, exist_ok=True)
+        self._result_cache: OrderedDict = OrderedDict()
+    
+    async def parse_statement(self, pdf_path: Union[str, bytes],
+                              content_hash: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Parse credit card statement, reusing the result for content seen before.
+        Results are cached by SHA-256 of the PDF content, so the same path with
+        new content is parsed again. Pass content_hash if already computed.
+        
+        pdf_path may also be the PDF content itself, for in-memory uploads."""
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(self._content_hash, pdf_path)
+        
+        cached = self._result_cache.get(content_hash)
+        if cached is not None:
+            self._result_cache.move_to_end(content_hash)
+            logger.info(f"Reusing cached result for {content_hash[:12]}")
+            return dict(cached)
+        
+        results = await self._parse_uncached(pdf_path, content_hash)
+        # A failed parse may be a transient extraction or OCR error - don't
+        # pin it in the cache
+        if not self.is_incomplete(results):
+            self._result_cache[content_hash] = dict(results)
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return results
+    
+    @classmethod
+    def is_incomplete(cls, results: Dict[str, Optional[str]]) -> bool:
+        """Whether a result is not worth reusing: the bank wasn't recognised or
+        no field was found. Extraction and OCR errors are logged, not raised,
+        so a failed parse comes back looking like this."""
+        return results.get('bank') in (None, "UNKNOWN") or not any(results.get(key) for key in cls.FIELDS)
     
-    def parse_statement(self, pdf_path: str) -> Dict[str, Optional[str]]:
-        """Parse credit card statement using both regex and OCR"""
-        logger.info(f"Processing: {pdf_path}")
+    @staticmethod
+    def _content_hash(pdf_path: Union[str, bytes]) -> str:
+        """SHA-256 hex digest of the PDF content"""
+        if isinstance(pdf_path, bytes):
+            return hashlib.sha256(pdf_path).hexdigest()
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _cached_text(self, content_hash: str, kind: str, extract, *args) -> str:
+        """Return extract(*args), reading and writing the on-disk text cache
+        when one is configured. Text rather than results is cached, so
+        pattern changes still apply on the next run."""
+        if not self.text_cache_dir:
+            return extract(*args)
+        
+        cache_path = os.path.join(self.text_cache_dir, f"{content_hash}.{kind}.txt")
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
+        text = extract(*args)
+        # Extraction errors come back empty - don't pin them in the cache
+        if text:
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.text_cache_dir, suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not write text cache {cache_path}: {e}")
+        return text
+    
+    async def _parse_uncached(self, pdf_path: Union[str, bytes], content_hash: str) -> Dict[str, Optional[str]]:
+        """Parse credit card statement using regex, falling back to OCR.
+        OCR only runs when the PyPDF2 text leaves fields missing (or the bank
+        trusts OCR for a field), one page range at a time."""
+        if isinstance(pdf_path, bytes):
+            logger.info(f"Processing: in-memory PDF ({len(pdf_path)} bytes)")
+        else:
+            logger.info(f"Processing: {pdf_path}")
         
         # Extract text using PyPDF2
-        text_content = self._extract_text_from_pdf(pdf_path)
+        text_content = await asyncio.to_thread(
+            self._cached_text, content_hash, self.text_backend, self._extract_text_from_pdf, pdf_path
+        )
         
-        # Extract text using OCR
-        ocr_content = self._extract_text_from_ocr(pdf_path)
+        # Detect bank and extract fields from the text layer first
+        bank = self._detect_bank(text_content, "")
+        regex_results = self._extract_with_regex(text_content, bank, "PyPDF2")
+        ocr_results = dict.fromkeys(self.FIELDS)
+        
+        # pdf2image spools bytes to a temp file on every render, so an in-memory
+        # PDF is written out once, the first time OCR actually runs, and every
+        # page range and retry renders from that file
+        ocr_path = None if isinstance(pdf_path, bytes) else pdf_path
+        
+        def extract_ocr(first_page: int, last_page: int) -> str:
+            nonlocal ocr_path
+            if ocr_path is None:
+                try:
+                    ocr_path = self._spool_pdf(pdf_path)
+                except OSError as e:
+                    logger.error(f"Error writing PDF for OCR: {e}")
+                    return ""
+            return self._extract_text_from_ocr(ocr_path, first_page, last_page)
+        
+        ocr_content = ""
+        try:
+            for first_page, last_page in self.OCR_PAGE_RANGES:
+                if not self._needs_ocr(regex_results, ocr_results, bank):
+                    break
+                
+                # Extract text using OCR for the next page range
+                ocr_content += await asyncio.to_thread(
+                    self._cached_text, content_hash, f"ocr{first_page}-{last_page}.{self.OCR_DPI}dpi",
+                    extract_ocr, first_page, last_page
+                )
+                
+                # OCR may reveal the bank on scanned statements
+                detected = self._detect_bank(text_content, ocr_content)
+                if detected != bank:
+                    bank = detected
+                    regex_results = self._extract_with_regex(text_content, bank, "PyPDF2")
+                ocr_results = self._extract_with_regex(ocr_content, bank, "OCR")
+        finally:
+            if ocr_path is not None and ocr_path is not pdf_path:
+                os.unlink(ocr_path)
         
-        # Detect bank
-        bank = self._detect_bank(text_content, ocr_content)
         logger.info(f"Detected bank: {bank}")
         
-        # Extract fields using both methods
-        regex_results = self._extract_with_regex(text_content, bank, "PyPDF2")
-        ocr_results = self._extract_with_regex(ocr_content, bank, "OCR")
-        
         # Combine results with bank-specific logic
         final_results = self._combine_results(regex_results, ocr_results, bank)
         final_results['bank'] = bank
@@ -57,62 +464,160 @@ class CreditCardParser:
         
         return final_results
     
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF using PyPDF2"""
+    @staticmethod
+    def _spool_pdf(pdf_data: bytes) -> str:
+        """Write in-memory PDF content to a temp file for the OCR renderer"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+            temp_file.write(pdf_data)
+        return temp_file.name
+    
+    def _needs_ocr(self, regex_results: Dict, ocr_results: Dict, bank: str) -> bool:
+        """Whether OCR could still improve the result"""
+        if bank == "UNKNOWN":
+            return True
+        
+        preferred = self.OCR_PREFERRED_FIELDS.get(bank, ())
+        for key in self.FIELDS:
+            if ocr_results.get(key):
+                continue
+            # Missing everywhere, or only PyPDF2 has a value OCR is trusted for
+            if key in preferred or not regex_results.get(key):
+                return True
+        return False
+    
+    def _extract_text_from_pdf(self, pdf_path: Union[str, bytes]) -> str:
+        """Extract text from PDF using PyPDF2 (or pdfium/PyMuPDF if configured)"""
         try:
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text
+            if self.text_backend == "pdfium":
+                return self._extract_text_with_pdfium(pdf_path)
+            if self.text_backend == "pymupdf":
+                return self._extract_text_with_pymupdf(pdf_path)
+            
+            if isinstance(pdf_path, bytes):
+                return self._extract_pages_text(PdfReader(io.BytesIO(pdf_path)))
+            
+            # Memory-map the file rather than letting PdfReader read it into a
+            # BytesIO copy - the OS page cache serves reads directly
+            with open(pdf_path, 'rb') as pdf_file, \
+                    mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_map:
+                return self._extract_pages_text(PdfReader(pdf_map))
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             return ""
     
-    def _extract_text_from_ocr(self, pdf_path: str) -> str:
+    def _extract_pages_text(self, reader: PdfReader) -> str:
+        """Concatenate the text of every page of an open PyPDF2 reader"""
+        page_texts = []
+        for page in reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                page_texts.append(page_text + "\n")
+        return "".join(page_texts)
+    
+    def _extract_text_with_pdfium(self, pdf_path: Union[str, bytes]) -> str:
+        """Extract text from PDF using pdfium"""
+        import pypdfium2 as pdfium
+        
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(pdf_path)
+            try:
+                page_texts = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    page_texts.append(textpage.get_text_range() + "\n")
+                    textpage.close()
+                    page.close()
+                return "".join(page_texts)
+            finally:
+                pdf.close()
+    
+    def _extract_text_with_pymupdf(self, pdf_path: Union[str, bytes]) -> str:
+        """Extract text from PDF using PyMuPDF"""
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf  # PyMuPDF before 1.24.3
+        
+        if isinstance(pdf_path, bytes):
+            doc = pymupdf.open(stream=pdf_path, filetype="pdf")
+        else:
+            doc = pymupdf.open(pdf_path)
+        with doc:
+            return "".join(page.get_text("text") + "\n" for page in doc)
+    
+    def _extract_text_from_ocr(self, pdf_path: Union[str, bytes], first_page: int = 1, last_page: int = 3) -> str:
         """Extract text from PDF using OCR"""
         try:
-            images = convert_from_path(pdf_path, dpi=300, first_page=1, last_page=3)
+            # Render straight to grayscale (pdftoppm -gray): tesseract converts to
+            # gray anyway, and 8-bit pages are a third the size of RGB ones.
+            # thread_count splits the page range across parallel pdftoppm runs.
+            convert = convert_from_bytes if isinstance(pdf_path, bytes) else convert_from_path
+            images = convert(pdf_path, dpi=self.OCR_DPI, first_page=first_page, last_page=last_page,
+                             grayscale=True,
+                             thread_count=min(last_page - first_page + 1, OCR_MAX_WORKERS))
+            
+            if len(images) > 1 and OCR_MAX_WORKERS == 1 and tesserocr is None:
+                # No cores to fan out to - amortize tesseract start-up instead
+                try:
+                    page_texts = _ocr_pages_batched(images)
+                finally:
+                    for image in images:
+                        image.close()
+            else:
+                # Fan pages out across the OCR pool; map() keeps page order
+                page_texts = list(_ocr_executor.map(_ocr_and_release, images))
+            del images
+            
+            # Escalate only the pages that read poorly at the lower resolution
+            retry_pages = [
+                i for i, text in enumerate(page_texts)
+                if len(text.strip()) < self.OCR_MIN_PAGE_CHARS
+            ]
+            if retry_pages:
+                def ocr_at_retry_dpi(i: int) -> Optional[str]:
+                    page = first_page + i
+                    try:
+                        images = convert(pdf_path, dpi=self.OCR_RETRY_DPI, first_page=page, last_page=page,
+                                         grayscale=True)
+                        return _ocr_and_release(images[0])
+                    except Exception as e:
+                        # The retry is optional - keep the first-pass text
+                        logger.warning(f"OCR retry failed for page {page}: {e}")
+                        return None
+                
+                retried = _ocr_executor.map(ocr_at_retry_dpi, retry_pages)
+                for i, text in zip(retry_pages, retried):
+                    if text is None:
+                        continue
+                    logger.info(f"OCR retried page {first_page + i} at {self.OCR_RETRY_DPI} DPI")
+                    if len(text.strip()) > len(page_texts[i].strip()):
+                        page_texts[i] = text
             
-            ocr_text = ""
-            for i, image in enumerate(images):
-                text = pytesseract.image_to_string(image, lang='eng', config='--psm 6')
-                ocr_text += text + "\n"
-                logger.info(f"OCR processed page {i+1}")
+            for i in range(len(page_texts)):
+                logger.info(f"OCR processed page {first_page + i}")
             
-            return ocr_text
+            return "".join(text + "\n" for text in page_texts)
         except Exception as e:
             logger.error(f"Error in OCR processing: {e}")
             return ""
     
     def _detect_bank(self, text_content: str, ocr_content: str) -> str:
         """Detect bank from statement"""
-        combined_text = (text_content + " " + ocr_content).lower()
-        
-        if "hdfc bank" in combined_text or "hdfcbank" in combined_text:
-            return "HDFC"
-        elif "icici bank" in combined_text or "icicibank" in combined_text:
-            return "ICICI"
-        elif "kotak" in combined_text:
-            return "KOTAK"
-        elif "american express" in combined_text or "amex" in combined_text or "aebc" in combined_text:
-            return "AMEX"
-        elif "capital one" in combined_text or "capitalone" in combined_text:
-            return "CAPITAL_ONE"
-        else:
-            return "UNKNOWN"
+        # Search each source on its own instead of lowercasing a joined copy.
+        # Every extractor ends each page with a newline, so a keyword (some
+        # contain spaces) never spanned the two sources when they were joined.
+        texts = [text.lower() for text in (text_content, ocr_content) if text]
+        
+        for bank, keywords in self.BANK_KEYWORDS.items():
+            if any(keyword in text for keyword in keywords for text in texts):
+                return bank
+        return "UNKNOWN"
     
     def _extract_with_regex(self, text: str, bank: str, method: str) -> Dict[str, Optional[str]]:
         """Extract fields using bank-specific patterns"""
-        results = {
-            'due_date': None,
-            'last_4_digits': None,
-            'credit_limit': None,
-            'available_credit': None,
-            'statement_date': None
-        }
+        results = dict.fromkeys(self.FIELDS)
+        if re2 is not None:
+            text = text.translate(_RE2_WHITESPACE)
         
         if bank == "HDFC":
             results.update(self._parse_hdfc(text, method))
@@ -133,47 +638,24 @@ class CreditCardParser:
                            3,02,000 23,519 0.00 (PyPDF2)
                            3,02,000 2,56,760.00 - (OCR - correct!)
         """
+        patterns = self._PATTERNS["HDFC"]
         results = {}
         
-        # Due Date - Pattern: Payment Due Date Total Dues Minimum Amount Due
-        #                     28/06/2019 45,240.00 13,636.00
-        patterns = [
-            r'Payment\s+Due\s+Date\s+Total\s+Dues\s+Minimum\s+Amount\s+Due\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-            r'Payment\s+Due\s+Date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-        ]
-        results['due_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        # Card Number: Card No: 5228 52XX XXXX 0591
-        patterns = [
-            r'Card\s+No[:\s]+\d{4}\s+\d{2}XX\s+XXXX\s+(\d{4})',
-        ]
-        results['last_4_digits'] = self._find_first_match(text, patterns)
-        
-        # Credit Limit - First number after "Credit Limit Available Credit Limit"
-        patterns = [
-            r'Credit\s+Limit\s+Available\s+Credit\s+Limit[^\d]+(\d{1},?\d{2},\d{3})',
-        ]
-        results['credit_limit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Available Credit - For OCR, look for pattern with comma: 2,56,760.00
-        # OCR has the correct value!
+        results['due_date'] = self._find_first_match(text, patterns['due_date'], format_func=self._format_date)
+        results['last_4_digits'] = self._find_first_match(text, patterns['last_4_digits'])
+        
         if method == "OCR":
-            patterns = [
-                r'Available\s+Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}[^\d]+(\d{1},\d{2},\d{3}(?:\.\d{2})?)',
-                r'Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}[^\d]+(\d{1},\d{2},\d{3}(?:\.\d{2})?)',
-            ]
+            results['credit_limit'], _ = self._find_credit_pair(text, patterns['credit_limit_available_credit'])
+            # Available Credit - OCR has the correct value!
+            results['available_credit'] = self._find_first_match(
+                text, patterns['available_credit_ocr'], format_func=self._clean_amount
+            )
         else:
-            # PyPDF2 shows 23,519 which might be wrong
-            patterns = [
-                r'Credit\s+Limit\s+Available\s+Credit\s+Limit[^\d]+\d{1},?\d{2},\d{3}\s+([0-9,]+)',
-            ]
-        results['available_credit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
+            results['credit_limit'], results['available_credit'] = self._find_credit_pair(
+                text, patterns['credit_limit_available_credit'], patterns['available_credit']
+            )
         
-        # Statement Date
-        patterns = [
-            r'Statement\s+Date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-        ]
-        results['statement_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
+        results['statement_date'] = self._find_first_match(text, patterns['statement_date'], format_func=self._format_date)
         
         return results
     
@@ -185,42 +667,24 @@ class CreditCardParser:
         
         Need to match the one AFTER "Credit Limit Available Credit"
         """
+        patterns = self._PATTERNS["ICICI"]
         results = {}
         
         # Due Date - Only from PyPDF2 (OCR has wrong date)
-        patterns = [
-            r'Due\s+Date\s*:\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-        ]
-        results['due_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        # Card Number
-        patterns = [
-            r'\d{4}\s+XXXX\s+XXXX\s+(\d{3,4})',
-        ]
-        matches = re.findall(patterns[0], text, re.IGNORECASE)
+        results['due_date'] = self._find_first_match(text, patterns['due_date'], format_func=self._format_date)
+        
+        # Card Number - the last occurrence is the right one
+        matches = patterns['last_4_digits'][0].findall(text)
         if matches:
             results['last_4_digits'] = matches[-1].zfill(4)
         
-        # Credit Limit and Available Credit
-        # MUST match the line AFTER "Credit Limit Available Credit"
-        # Pattern: Credit Limit Available Credit ... Summary 83,000.00 77,115.48
-        patterns = [
-            # Match: Credit [Credit] Limit Available Credit ... Summary XX,XXX.XX XX,XXX.XX
-            r'Credit\s+(?:Credit\s+)?Limit\s+Available\s+Credit[^S]*?Summary\s+(\d{1,3},\d{3}(?:\.\d{2})?)\s+(\d{1,3},\d{3}(?:\.\d{2})?)',
-            # PyPDF2 format: Credit SummaryCredit Limit Available Credit\n83,000.00 77,115.48
-            r'Credit\s+Summary\s*Credit\s+Limit\s+Available\s+Credit[^\d]+(\d{1,3},\d{3}(?:\.\d{2})?)\s+(\d{1,3},\d{3}(?:\.\d{2})?)',
-        ]
-        
-        match = self._find_first_match_obj(text, patterns)
+        # Credit Limit and Available Credit come from one match
+        match = self._find_first_match_obj(text, patterns['credit_limit_available_credit'])
         if match:
             results['credit_limit'] = self._clean_amount(match.group(1))
             results['available_credit'] = self._clean_amount(match.group(2))
         
-        # Statement Date
-        patterns = [
-            r'Statement\s+Date[^\d]{0,50}?(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-        ]
-        results['statement_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
+        results['statement_date'] = self._find_first_match(text, patterns['statement_date'], format_func=self._format_date)
         
         return results
     
@@ -229,83 +693,14 @@ class CreditCardParser:
         Pattern: Credit Limit(Rs.) Available Credit
                  900,000 380,229.49
         """
-        results = {}
-        
-        # Due Date
-        patterns = [
-            r'Due\s+Date\s+(\d{1,2}[-/]\w{3}[-/]\d{4})',
-        ]
-        results['due_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        # Card Number: 414767XXXXXX6705
-        patterns = [
-            r'\d{6}X+(\d{4})',
-        ]
-        results['last_4_digits'] = self._find_first_match(text, patterns)
-        
-        # Credit Limit - First number: 900,000
-        patterns = [
-            r'Credit\s+Limit\s*\(Rs\.\)\s+Available\s+Credit[^\d]+([0-9,]+(?:\.\d{2})?)',
-        ]
-        results['credit_limit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Available Credit - Second number: 380,229.49
-        patterns = [
-            r'Credit\s+Limit\s*\(Rs\.\)\s+Available\s+Credit[^\d]+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
-        ]
-        results['available_credit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Statement Date
-        patterns = [
-            r'Statement\s+Date\s+(\d{1,2}[-/]\w{3}[-/]\d{4})',
-        ]
-        results['statement_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        return results
+        return self._parse_fields(text, self._PATTERNS["KOTAK"])
     
     def _parse_amex(self, text: str, method: str) -> Dict[str, Optional[str]]:
         """Parse American Express statement
         Pattern: Credit Summary Credit Limit Rs Available Credit Limit Rs
                  At January 14, 2024 470,000.00 257,545.52
         """
-        results = {}
-        
-        # Due Date: February 1, 2024
-        patterns = [
-            r'Due\s+by\s+(\w+\s+\d{1,2},?\s+\d{4})',
-            r'Minimum\s+Payment:\s+Rs\s+[0-9,]+(?:\.\d{2})?\s+Due\s+by\s+(\w+\s+\d{1,2},?\s+\d{4})',
-        ]
-        results['due_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        # Membership Number: XXXX-XXXXXX-01007 (last 5 digits)
-        patterns = [
-            r'XXXX-XXXX+-(\d{5})',
-            r'Membership\s+Number[^\d]+XXXX-XXXX+-(\d{5})',
-        ]
-        results['last_4_digits'] = self._find_first_match(text, patterns)
-        
-        # Credit Limit: Pattern shows 470,000.00 257,545.52 on same line
-        patterns = [
-            r'Credit\s+Summary\s+Credit\s+Limit\s+Rs[^\d]+Available\s+Credit\s+Limit\s+Rs[^\d]+At[^\d]+\d{1,2}[/-]\d{1,2}[/-]\d{4}\s+([0-9,]+(?:\.\d{2})?)',
-            r'At\s+\w+\s+\d{1,2},?\s+\d{4}\s+([0-9,]+(?:\.\d{2})?)\s+[0-9,]+(?:\.\d{2})?',
-        ]
-        results['credit_limit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Available Credit Limit: Second number
-        patterns = [
-            r'Credit\s+Summary\s+Credit\s+Limit\s+Rs[^\d]+Available\s+Credit\s+Limit\s+Rs[^\d]+At[^\d]+\d{1,2}[/-]\d{1,2}[/-]\d{4}\s+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
-            r'At\s+\w+\s+\d{1,2},?\s+\d{4}\s+[0-9,]+(?:\.\d{2})?\s+([0-9,]+(?:\.\d{2})?)',
-        ]
-        results['available_credit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Statement Date: From "Membership Number Date" field
-        patterns = [
-            r'Membership\s+Number\s+Date[^\d]+XXXX-XXXX+-\d{5}\s+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-            r'Date[^\d]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
-        ]
-        results['statement_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        return results
+        return self._parse_fields(text, self._PATTERNS["AMEX"])
     
     def _parse_capital_one(self, text: str, method: str) -> Dict[str, Optional[str]]:
         """Parse Capital One statement
@@ -313,54 +708,60 @@ class CreditCardParser:
                  at 05/10/24
                  £780.74
         """
+        return self._parse_fields(text, self._PATTERNS["CAPITAL_ONE"])
+    
+    def _parse_fields(self, text: str, patterns: Dict[str, List[Pattern]]) -> Dict[str, Optional[str]]:
+        """Extract every field with its own pattern list"""
         results = {}
+        if 'credit_limit_available_credit' in patterns:
+            results['credit_limit'], results['available_credit'] = self._find_credit_pair(
+                text, patterns['credit_limit_available_credit'], patterns['available_credit']
+            )
         
-        # Due Date: It's due on 31 Oct 24
-        patterns = [
-            r"It'?s\s+due\s+on\s+(\d{1,2}\s+\w{3}\s+\d{2,4})",
-        ]
-        results['due_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
-        # Card Number: **** **** **** 4811
-        patterns = [
-            r'\*{4}\s+\*{4}\s+\*{4}\s+(\d{4})',
-        ]
-        results['last_4_digits'] = self._find_first_match(text, patterns)
-        
-        # Credit Limit
-        patterns = [
-            r'Credit\s+limit[^\d]+£([0-9,]+(?:\.\d{2})?)',
-        ]
-        results['credit_limit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Available to spend - handle newlines between "as" and "at"
-        patterns = [
-            r'Available\s+to\s+spend\s+as[^\d£]*at[^\d]+\d{2}/\d{2}/\d{2}[^\d£]+£([0-9,]+(?:\.\d{2})?)',
-            r'Available\s+to\s+spend[^\d£]+£([0-9,]+(?:\.\d{2})?)',
-        ]
-        results['available_credit'] = self._find_first_match(text, patterns, format_func=self._clean_amount)
-        
-        # Statement Date: Statement date 5 October 24
-        patterns = [
-            r'Statement\s+date[^\d]+(\d{1,2}\s+\w+\s+\d{2,4})',
-        ]
-        results['statement_date'] = self._find_first_match(text, patterns, format_func=self._format_date)
-        
+        for key in self.FIELDS:
+            if key in results:
+                continue
+            if key in self.DATE_FIELDS:
+                format_func = self._format_date
+            elif key in self.AMOUNT_FIELDS:
+                format_func = self._clean_amount
+            else:
+                format_func = None
+            results[key] = self._find_first_match(text, patterns[key], format_func=format_func)
         return results
     
-    def _find_first_match(self, text: str, patterns: List[str], format_func=None) -> Optional[str]:
+    def _find_credit_pair(self, text: str, pair_patterns: List[Pattern],
+                          available_patterns: Optional[List[Pattern]] = None):
+        """Read credit limit and available credit from one scan.
+        Both numbers follow the same header, so a paired pattern (second group
+        optional) finds them together. The standalone available credit patterns
+        are only tried when the header matched without a second number."""
+        match = self._find_first_match_obj(text, pair_patterns)
+        if not match:
+            return None, None
+        
+        credit_limit = self._clean_amount(match.group(1))
+        if match.group(2):
+            available_credit = self._clean_amount(match.group(2))
+        elif available_patterns:
+            available_credit = self._find_first_match(text, available_patterns, format_func=self._clean_amount)
+        else:
+            available_credit = None
+        return credit_limit, available_credit
+    
+    def _find_first_match(self, text: str, patterns: List[Pattern], format_func=None) -> Optional[str]:
         """Try multiple patterns and return first match"""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            match = pattern.search(text)
             if match:
                 value = match.group(1)
                 return format_func(value) if format_func else value
         return None
     
-    def _find_first_match_obj(self, text: str, patterns: List[str]) -> Optional[re.Match]:
+    def _find_first_match_obj(self, text: str, patterns: List[Pattern]) -> Optional[re.Match]:
         """Try multiple patterns and return first match object"""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            match = pattern.search(text)
             if match:
                 return match
         return None
@@ -368,23 +769,14 @@ class CreditCardParser:
     def _combine_results(self, regex_results: Dict, ocr_results: Dict, bank: str) -> Dict:
         """Combine results with bank-specific logic"""
         final = {}
+        preferred = self.OCR_PREFERRED_FIELDS.get(bank, ())
         
-        for key in ['due_date', 'last_4_digits', 'credit_limit', 'available_credit', 'statement_date']:
-            # Bank-specific logic
-            if bank == "HDFC" and key == "available_credit":
-                # OCR is more accurate for HDFC available credit
+        for key in self.FIELDS:
+            if key in preferred:
                 final[key] = ocr_results.get(key) or regex_results.get(key)
-            elif bank == "ICICI":
-                if key == "due_date":
-                    # PyPDF2 is correct for ICICI due date (OCR has error)
-                    final[key] = regex_results.get(key) or ocr_results.get(key)
-                elif key in ["credit_limit", "available_credit", "statement_date"]:
-                    # OCR has the credit values for ICICI
-                    final[key] = ocr_results.get(key) or regex_results.get(key)
-                else:
-                    final[key] = regex_results.get(key) or ocr_results.get(key)
             else:
                 # Default: prefer regex (PyPDF2), fallback to OCR
+                # (PyPDF2 is also correct for ICICI due date - OCR has error)
                 final[key] = regex_results.get(key) or ocr_results.get(key)
         
         return final
@@ -394,7 +786,7 @@ class CreditCardParser:
         if not amount_str:
             return None
         # Remove everything except digits, commas, and decimal points
-        cleaned = re.sub(r'[^\d,.]', '', amount_str)
+        cleaned = amount_str.translate(_AMOUNT_TABLE)
         return cleaned.strip() if cleaned else None
     
     def _format_date(self, date_str: str) -> Optional[str]:
@@ -404,14 +796,12 @@ class CreditCardParser:
         
         date_str = date_str.strip()
         
-        date_formats = [
-            '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
-            '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d-%B-%Y',
-            '%B %d, %Y', '%b %d, %Y', '%d %b %y',
-            '%d %B %y', '%d %b %Y', '%d %B %Y',
-            '%d %b-%Y', '%d-%b %Y',
-            '%d %B %y', '%d-%B-%Y',
-        ]
+        # Only try the formats that fit the string's shape - every failed
+        # strptime attempt raises and catches a ValueError
+        if any(c.isalpha() for c in date_str):
+            date_formats = self._DATE_FORMATS_COMMA if ',' in date_str else self._DATE_FORMATS_NAMED
+        else:
+            date_formats = self._DATE_FORMATS_SLASH if '/' in date_str else self._DATE_FORMATS_DASH
         
         for fmt in date_formats:
             try:
@@ -433,31 +823,44 @@ class CreditCardParser:
 if __name__ == "__main__":
     import sys
     
-    parser = CreditCardParser()
+    parser = CreditCardParser(text_cache_dir=os.getenv('PDF_TEXT_CACHE_DIR'))
     
     if len(sys.argv) > 1:
-        pdf_path = sys.argv[1]
+        pdf_paths = sys.argv[1:]
     else:
-        pdf_path = "path/to/credit_card_statement.pdf"
+        pdf_paths = ["path/to/credit_card_statement.pdf"]
     
-    try:
-        result = parser.parse_statement(pdf_path)
-        
-        print("\n" + "="*60)
-        print("CREDIT CARD STATEMENT PARSER - RESULTS")
-        print("="*60)
-        print(f"Bank: {result.get('bank', 'Unknown')}")
-        print(f"Due Date: {result.get('due_date', 'Not found')}")
-        print(f"Last 4 Digits: {result.get('last_4_digits', 'Not found')}")
-        print(f"Credit Limit: {result.get('credit_limit', 'Not found')}")
-        print(f"Available Credit: {result.get('available_credit', 'Not found')}")
-        print(f"Statement Date: {result.get('statement_date', 'Not found')}")
-        print("="*60 + "\n")
-        
-    except FileNotFoundError:
-        print(f"Error: File not found - {pdf_path}")
-        print("Usage: python parser.py <path_to_pdf>")
-    except Exception as e:
-        print(f"Error processing statement: {e}")
-        import traceback
-        traceback.print_exc()
\ No newline at end of file
+    async def parse_all():
+        """Parse every file concurrently; OCR shares the parser's thread pool"""
+        return await asyncio.gather(
+            *(parser.parse_statement(pdf_path) for pdf_path in pdf_paths),
+            return_exceptions=True
+        )
+    
+    # Collect the whole report and write it once, rather than a print() per line
+    lines = []
+    for pdf_path, result in zip(pdf_paths, asyncio.run(parse_all())):
+        if isinstance(result, FileNotFoundError):
+            lines.append(f"Error: File not found - {pdf_path}")
+            lines.append("Usage: python parser.py <path_to_pdf> [<path_to_pdf> ...]")
+            continue
+        if isinstance(result, Exception):
+            import traceback
+            lines.append(f"Error processing statement {pdf_path}: {result}")
+            lines.append("".join(traceback.format_exception(result)).rstrip("\n"))
+            continue
+        
+        lines.append("\n" + "="*60)
+        lines.append("CREDIT CARD STATEMENT PARSER - RESULTS")
+        lines.append("="*60)
+        if len(pdf_paths) > 1:
+            lines.append(f"File: {pdf_path}")
+        lines.append(f"Bank: {result.get('bank', 'Unknown')}")
+        lines.append(f"Due Date: {result.get('due_date', 'Not found')}")
+        lines.append(f"Last 4 Digits: {result.get('last_4_digits', 'Not found')}")
+        lines.append(f"Credit Limit: {result.get('credit_limit', 'Not found')}")
+        lines.append(f"Available Credit: {result.get('available_credit', 'Not found')}")
+        lines.append(f"Statement Date: {result.get('statement_date', 'Not found')}")
+        lines.append("="*60 + "\n")
+    
+    sys.stdout.write("\n".join(lines) + "\n")